@@ -2,10 +2,12 @@ from dotenv import load_dotenv
 
 from .main import (
     create_memory,
+    create_memories,
     create_unique_memory,
     get_memories,
     search_memory,
     get_memory,
+    get_memory_with_embedding,
     update_memory,
     delete_memory,
     delete_memories,
@@ -13,6 +15,23 @@ from .main import (
     count_memories,
     wipe_category,
     wipe_all_memories,
+    acreate_memory,
+    acreate_memories,
+    acreate_unique_memory,
+    asearch_memory,
+    aget_memory,
+    aget_memory_with_embedding,
+    aget_memories,
+    aupdate_memory,
+    adelete_memory,
+    adelete_memories,
+    adelete_similar_memories,
+    acount_memories,
+)
+
+from .batcher import (
+    create_memory_async,
+    get_batcher,
 )
 
 from .events import (
@@ -51,10 +70,12 @@ load_dotenv()
 
 __all__ = [
     "create_memory",
+    "create_memories",
     "create_unique_memory",
     "get_memories",
     "search_memory",
     "get_memory",
+    "get_memory_with_embedding",
     "update_memory",
     "delete_memory",
     "delete_memories",
@@ -62,6 +83,20 @@ __all__ = [
     "count_memories",
     "wipe_category",
     "wipe_all_memories",
+    "acreate_memory",
+    "acreate_memories",
+    "acreate_unique_memory",
+    "asearch_memory",
+    "aget_memory",
+    "aget_memory_with_embedding",
+    "aget_memories",
+    "aupdate_memory",
+    "adelete_memory",
+    "adelete_memories",
+    "adelete_similar_memories",
+    "acount_memories",
+    "create_memory_async",
+    "get_batcher",
     "chroma_collection_to_list",
     "list_to_chroma_collection",
     "export_memory_to_json",
@@ -0,0 +1,211 @@
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+
+from agentmemory.helpers import debug_log
+from agentmemory.main import create_memories
+
+DEFAULT_MAX_BATCH_SIZE = 128
+DEFAULT_BATCH_TIMEOUT_MS = 100
+
+
+class MemoryBatcher:
+    """
+    Coalesce memories submitted from concurrent callers into a single
+    create_memories call per category.
+
+    A category is written once it holds max_batch_size memories, or
+    batch_timeout_ms after its first pending memory was submitted.
+    """
+
+    def __init__(
+        self,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        batch_timeout_ms=DEFAULT_BATCH_TIMEOUT_MS,
+    ):
+        self.max_batch_size = max_batch_size
+        self.batch_timeout_ms = batch_timeout_ms
+        # category -> list of (item, future) waiting to be written
+        self._buffers = {}
+        # category -> time.monotonic() at which the category must be written
+        self._deadlines = {}
+        # number of memories taken from the buffers but not written yet
+        self._writing = 0
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def submit(self, category, text, metadata=None, embedding=None, id=None):
+        """
+        Queue a memory for creation.
+
+        Arguments:
+            category (str): Category of the collection.
+            text (str): Document text.
+            metadata (dict, optional): Metadata.
+            embedding (array, optional): Embedding of the document.
+            id (str, optional): Unique id.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the id of the memory once it is written.
+        """
+        future = Future()
+        item = {"text": text, "metadata": metadata, "embedding": embedding, "id": id}
+
+        with self._condition:
+            buffer = self._buffers.setdefault(category, [])
+            if len(buffer) == 0:
+                self._deadlines[category] = (
+                    time.monotonic() + self.batch_timeout_ms / 1000.0
+                )
+            buffer.append((item, future))
+
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="agentmemory-batcher", daemon=True
+                )
+                self._worker.start()
+            self._condition.notify()
+
+        return future
+
+    def flush(self):
+        """
+        Write all pending memories now, and wait for writes already in progress.
+        """
+        with self._condition:
+            batches = list(self._buffers.items())
+            self._buffers.clear()
+            self._deadlines.clear()
+
+        for category, batch in batches:
+            self._write(category, batch)
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._writing == 0)
+
+    def _take_ready(self):
+        # must be called with self._condition held
+        now = time.monotonic()
+        ready = []
+        timeout = None
+        for category in list(self._buffers):
+            buffer = self._buffers[category]
+            deadline = self._deadlines[category]
+            if len(buffer) >= self.max_batch_size or deadline <= now:
+                ready.append((category, self._buffers.pop(category)))
+                del self._deadlines[category]
+                self._writing += len(buffer)
+            elif timeout is None or deadline - now < timeout:
+                timeout = deadline - now
+        return ready, timeout
+
+    def _run(self):
+        while True:
+            with self._condition:
+                ready, timeout = self._take_ready()
+                while len(ready) == 0:
+                    self._condition.wait(timeout)
+                    ready, timeout = self._take_ready()
+
+            for category, batch in ready:
+                try:
+                    self._write(category, batch)
+                except Exception:
+                    # keep the worker alive for the other batches
+                    debug_log(
+                        f"WARNING: Failed to write batched memories in category {category}",
+                        type="warning",
+                    )
+                finally:
+                    with self._condition:
+                        self._writing -= len(batch)
+                        self._condition.notify_all()
+
+    def _write(self, category, batch):
+        # skip the memories whose future was cancelled by the caller
+        batch = [
+            (item, future)
+            for item, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+
+        for start in range(0, len(batch), self.max_batch_size):
+            chunk = batch[start : start + self.max_batch_size]
+            try:
+                ids = create_memories(category, [item for item, _ in chunk])
+            except Exception:
+                debug_log(
+                    f"WARNING: Failed to write {len(chunk)} batched memories in category {category}, writing them one by one",
+                    type="warning",
+                )
+                # only fail the callers whose memory can't be written
+                for item, future in chunk:
+                    try:
+                        (id,) = create_memories(category, [item])
+                    except Exception as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(id)
+                continue
+
+            for (_, future), id in zip(chunk, ids):
+                future.set_result(id)
+
+
+batcher = None
+
+
+def get_batcher():
+    """
+    Return the process-wide MemoryBatcher, creating it on first use.
+
+    Pending memories are flushed when the interpreter exits.
+    """
+    global batcher
+    if batcher is not None:
+        return batcher
+
+    batcher = MemoryBatcher()
+    atexit.register(batcher.flush)
+    return batcher
+
+
+async def create_memory_async(category, text, metadata=None, embedding=None, id=None):
+    """
+    Create a new memory through the shared batcher, coalescing it with other
+    memories submitted to the same category within the batch window. Awaiting
+    it does not block the event loop, so concurrent handlers share a batch.
+
+    Use get_batcher().submit(...) to queue memories from synchronous code.
+
+    Arguments:
+    category (str): Category of the collection.
+    text (str): Document text.
+    metadata (dict): Metadata.
+    embedding (array): Embedding of the document.
+    id (str): Unique id.
+
+    Returns:
+    str: The id of the memory once it is written.
+
+    Example:
+    >>> await create_memory_async('sample_category', 'sample_text', metadata={'sample_key': 'sample_value'})
+    """
+
+    future = get_batcher().submit(
+        category, text, metadata=metadata, embedding=embedding, id=id
+    )
+    return await asyncio.wrap_future(future)
+
+
+def flush():
+    """
+    Write all memories still pending in the shared batcher.
+
+    Example:
+    >>> flush()
+    """
+    if batcher is not None:
+        batcher.flush()
@@ -1,8 +1,10 @@
 import os
 
 import chromadb
+import numpy as np
 
 from .client import CollectionMemory, AgentMemory
+from .helpers import new_id
 
 class ChromaCollectionMemory(CollectionMemory):
     def __init__(self, collection, metadata=None) -> None:
@@ -37,23 +39,32 @@ class ChromaCollectionMemory(CollectionMemory):
         where_document=None,
         include=["metadatas", "documents", "distances"],
     ):
+        if query_embeddings is not None:
+            # chroma only accepts lists of floats
+            query_embeddings = [
+                embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+                for embedding in query_embeddings
+            ]
         return self.collection.query(query_embeddings, query_texts, n_results, where, where_document, include)
 
     def update(self, ids, documents=None, metadatas=None, embeddings=None):
         return self.collection.update(ids, embeddings, metadatas, documents)
 
     def upsert(self, ids, documents=None, metadatas=None, embeddings=None):
-        # if no id is provided, generate one based on count of documents in collection
-        if any(id is None for id in ids):
-            origin = self.count()
-            # pad the id with zeros to make it 16 digits long
-            ids = [str(id_).zfill(16) for id_ in range(origin, origin+len(documents))]
+        # generate the missing ids
+        ids = [new_id() if id is None else id for id in ids]
 
         return self.collection.upsert(ids, embeddings, metadatas, documents)
 
     def delete(self, ids=None, where=None, where_document=None):
         return self.collection.delete(ids, where, where_document)
 
+    def embed(self, texts):
+        embedding_function = self.collection._embedding_function
+        if embedding_function is None:
+            return None
+        return embedding_function(texts)
+
 
 class ChromaMemory(AgentMemory):
     def __init__(self, path) -> None:
@@ -1,4 +1,5 @@
 import os
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import List, Dict, Callable
@@ -50,6 +51,10 @@ def get_plugin_manager():
 
 
 class CollectionMemory(ABC):
+    # True if the backend ignores the ids given to add/upsert and assigns its
+    # own, which add/upsert then return in order.
+    assigns_ids = False
+
     @abstractmethod
     def count(self):
         raise NotImplementedError()
@@ -98,6 +103,11 @@ class CollectionMemory(ABC):
     def delete(self, ids=None, where=None, where_document=None):
         raise NotImplementedError()
 
+    def embed(self, texts):
+        # Embeddings the collection would compute for texts, so that they can
+        # be reused as query_embeddings. None if the backend can't provide them.
+        return None
+
 @dataclass
 class AgentCollection():
     name: str
@@ -121,6 +131,8 @@ DEFAULT_CLIENT_TYPE = "CHROMA"
 CLIENT_TYPE = os.environ.get("CLIENT_TYPE", DEFAULT_CLIENT_TYPE)
 
 client = None
+# the async API calls get_client from worker threads: create the client once
+_client_lock = threading.Lock()
 
 
 def get_client(client_type=None):
@@ -128,13 +140,17 @@ def get_client(client_type=None):
     if client is not None:
         return client
 
-    client_type = client_type or CLIENT_TYPE
+    with _client_lock:
+        if client is not None:
+            return client
+
+        client_type = client_type or CLIENT_TYPE
 
-    factory_map = {}
-    pm = get_plugin_manager()
-    pm.hook.declare_client(factory_map=factory_map)
-    if client_type not in factory_map:
-        raise RuntimeError("Unknown client type: {client_type}")
-    client = factory_map[client_type]()
+        factory_map = {}
+        pm = get_plugin_manager()
+        pm.hook.declare_client(factory_map=factory_map)
+        if client_type not in factory_map:
+            raise RuntimeError("Unknown client type: {client_type}")
+        client = factory_map[client_type]()
 
     return client
@@ -53,13 +53,13 @@ def get_epoch():
     return int(memory["document"])
 
 
-def create_event(text, metadata={}, embedding=None):
+def create_event(text, metadata=None, embedding=None):
     """
     Creates a new event in the agent's memory.
 
     Args:
         text (str): The text content of the event.
-        metadata (dict, optional): Additional metadata for the event. Defaults to {}.
+        metadata (dict, optional): Additional metadata for the event. Defaults to None.
         embedding (object, optional): An optional embedding for the event.
 
     The current epoch value is automatically included in the metadata.
@@ -67,6 +67,7 @@ def create_event(text, metadata={}, embedding=None):
     Returns:
         object: The memory object created for this event.
     """
+    metadata = dict(metadata) if metadata else {}
     metadata["epoch"] = get_epoch()
     return create_memory("events", text, metadata=metadata, embedding=embedding)
 
@@ -1,5 +1,10 @@
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 from agentlogger import log
 
 
@@ -21,6 +26,61 @@ def strip_embeddings(value):
     return value
 
 
+class LRUCache:
+    """
+    Thread-safe mapping keeping only the maxsize most recently used entries.
+
+    Example:
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.put("key", "value")
+    >>> cache.get("key")
+    'value'
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# last id generated by new_id
+_last_id = 0
+_id_lock = threading.Lock()
+
+
+def new_id():
+    """
+    Generate a 16 character hexadecimal id from the current time in
+    nanoseconds, strictly increasing within the process so that ids sort in
+    creation order.
+    """
+    global _last_id
+    with _id_lock:
+        _last_id = max(time.time_ns(), _last_id + 1)
+        return f"{_last_id:016x}"
+
+
 def debug_log(
     content,
     input_dict=None,
@@ -57,60 +117,28 @@ def chroma_collection_to_list(collection):
 
     dict_list = []
 
-
     # check if collection is a list
     if isinstance(collection, list):
         return collection
 
-    # If there are no embeddings, zip metadatas, documents and ids together
-    if collection.get("embeddings", None) is None:
-        for metadata, document, id in zip(
-            collection["metadatas"], collection["documents"], collection["ids"]
-        ):
-            # append the zipped data as dictionary to the list
-            dict_list.append({"metadata": metadata, "document": document, "id": id})
-
-        return dict_list
-
-    # if distance is none, zip metadatas, documents, ids and embeddings together
-    if collection.get("distances", None) is None:
-        for metadata, document, id, embedding in zip(
-            collection["metadatas"],
-            collection["documents"],
-            collection["ids"],
-            collection["embeddings"],
-        ):
-            # append the zipped data as dictionary to the list
-            dict_list.append(
-                {
-                    "metadata": metadata,
-                    "document": document,
-                    "embedding": embedding,
-                    "id": id,
-                }
-            )
-
-        return dict_list
-
-    # if embeddings are present, zip all data including embeddings and distances
-    for metadata, document, id, embedding, distance in zip(
-        collection["metadatas"],
-        collection["documents"],
-        collection["ids"],
-        collection["embeddings"],
-        collection.get("distances"),
+    # embeddings and distances are only present if they were included
+    embeddings = collection.get("embeddings", None)
+    distances = collection.get("distances", None)
+
+    # zip metadatas, documents and ids together
+    for i, (metadata, document, id) in enumerate(
+        zip(collection["metadatas"], collection["documents"], collection["ids"])
     ):
+        item = {"metadata": metadata, "document": document, "id": id}
+        if embeddings is not None:
+            item["embedding"] = embeddings[i]
+        if distances is not None:
+            item["distance"] = distances[i]
         # append the zipped data as dictionary to the list
-        dict_list.append(
-            {
-                "metadata": metadata,
-                "document": document,
-                "embedding": embedding,
-                "distance": distance,
-                "id": id,
-            }
-        )
-    debug_log("Collection to list", {"collection": collection, "list": dict_list})
+        dict_list.append(item)
+
+    if DEBUG:
+        debug_log("Collection to list", {"collection": collection, "list": dict_list})
     return dict_list
 
 
@@ -156,7 +184,8 @@ def list_to_chroma_collection(list):
     if len(collection["distances"]) == 0:
         del collection["distances"]
 
-    debug_log("List to collection", {"collection": collection, "list": list})
+    if DEBUG:
+        debug_log("List to collection", {"collection": collection, "list": list})
     return collection
 
 
@@ -218,5 +247,42 @@ def get_include_types(include_embeddings, include_distances):
     if include_distances:
         include_types.append("distances")
 
-    debug_log("Get include types", {"include_types": include_types})
+    if DEBUG:
+        debug_log("Get include types", {"include_types": include_types})
     return include_types
+
+
+def filter_distances(collection, min_distance=None, max_distance=None):
+    """
+    Function to keep only the rows of a flattened query response whose distance is within range.
+
+    Arguments:
+    collection (dict): Flattened query response, including distances.
+    min_distance (float): Minimum distance to keep, or None.
+    max_distance (float): Maximum distance to keep, or None.
+
+    Returns:
+    dict: The collection with only the rows within range.
+
+    Example:
+    >>> filter_distances({'ids': ['1', '2'], 'distances': [0.1, 0.5], ...}, max_distance=0.2)
+    {'ids': ['1'], 'distances': [0.1], ...}
+    """
+    distances = np.asarray(collection["distances"], dtype=float)
+
+    # compute which rows to keep in a single pass over the distances
+    mask = np.ones(len(distances), dtype=bool)
+    if min_distance is not None:
+        mask &= distances >= min_distance
+    if max_distance is not None:
+        mask &= distances <= max_distance
+
+    if mask.all():
+        return collection
+
+    indices = np.flatnonzero(mask)
+    for key in ["ids", "embeddings", "documents", "metadatas", "distances"]:
+        if collection.get(key, None) is not None:
+            collection[key] = [collection[key][i] for i in indices]
+
+    return collection
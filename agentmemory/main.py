@@ -1,19 +1,133 @@
-import datetime
+import asyncio
+import functools
+import hashlib
+import heapq
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 from agentmemory.helpers import (
+    DEBUG,
+    LRUCache,
     chroma_collection_to_list,
     debug_log,
+    filter_distances,
     flatten_arrays,
     get_include_types,
+    new_id,
 )
 
 
 from agentmemory.client import get_client
 
-def create_memory(category, text, metadata={}, embedding=None, id=None):
+# number of results fetched by a first, smaller query when searching with a max_distance
+DISTANCE_PROBE_SIZE = 16
+
+# query embeddings of recent search texts, keyed by client, category and text digest
+_query_embeddings = LRUCache(maxsize=10_000)
+
+# novel memory each recently created unique memory content was related to,
+# keyed by client, category and content digest
+_novel_memories = LRUCache(maxsize=10_000)
+
+# metadata keys already reported as converted to strings
+_stringified_metadata_keys = set()
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_collection(client_id, category):
+    return get_client().get_or_create_collection(category)
+
+
+def _collection(category):
+    """
+    Get or create the collection for a category, reusing the handle from
+    previous calls. The cache is keyed by client, so a new client does not
+    see handles of the previous one.
+    """
+    return _cached_collection(id(get_client()), category)
+
+
+def _stringify_metadata(metadata):
+    """
+    Convert the metadata values that can't be stored as is (booleans, dicts
+    and lists) to strings. Each converted key is reported once per process.
+    """
+    converted = [
+        key
+        for key, value in metadata.items()
+        if isinstance(value, (bool, dict, list))
+    ]
+    if len(converted) == 0:
+        return metadata
+
+    for key in converted:
+        if key not in _stringified_metadata_keys:
+            _stringified_metadata_keys.add(key)
+            debug_log(
+                f"WARNING: Metadata field {key} converted to string", type="warning"
+            )
+
+    return {
+        key: str(value) if isinstance(value, (bool, dict, list)) else value
+        for key, value in metadata.items()
+    }
+
+
+def _build_where(filter_metadata, novel=False):
+    """
+    Build the where clause matching all the key:value pairs of filter_metadata,
+    and only novel memories if novel is set. Returns None if there is nothing
+    to filter on.
+    """
+    if novel:
+        filter_metadata = {**(filter_metadata or {}), "novel": "True"}
+
+    if not filter_metadata:
+        return None
+
+    if len(filter_metadata) == 1:
+        return dict(filter_metadata)
+
+    # map each key:value in filter_metadata to an object shaped like { "key": { "$eq": "value" } }
+    return {
+        "$and": [{key: {"$eq": value}} for key, value in filter_metadata.items()]
+    }
+
+
+def _text_key(category, text):
+    return (
+        id(get_client()),
+        category,
+        hashlib.blake2b(text.encode(), digest_size=16).digest(),
+    )
+
+
+def _query_embedding(memories, category, text):
+    """
+    Embed a search text with the collection's embedding function, reusing the
+    embedding of a previous search for the same text. Returns None if the
+    collection can't compute embeddings itself.
+    """
+    key = _text_key(category, text)
+
+    embedding = _query_embeddings.get(key)
+    if embedding is None:
+        embeddings = memories.embed([text])
+        if embeddings is None:
+            return None
+        # a float32 array takes a fraction of the memory of a list of floats
+        embedding = np.asarray(embeddings[0], dtype=np.float32)
+        _query_embeddings.put(key, embedding)
+
+    return embedding
+
+
+def create_memory(category, text, metadata=None, embedding=None, id=None):
     """
     Create a new memory in a collection.
 
@@ -24,39 +138,102 @@ def create_memory(category, text, metadata={}, embedding=None, id=None):
     metadata (dict): Metadata.
 
     Returns:
-    None
+    str: The id of the memory.
 
     Example:
     >>> create_memory('sample_category', 'sample_text', id='sample_id', metadata={'sample_key': 'sample_value'})
     """
 
+    return create_memories(
+        category,
+        [{"text": text, "metadata": metadata, "embedding": embedding, "id": id}],
+    )[0]
+
+
+def create_memories(category, items):
+    """
+    Create several memories in a collection with a single upsert.
+
+    Arguments:
+    category (str): Category of the collection.
+    items (list): List of dicts with a required "text" key and optional
+        "metadata", "embedding" and "id" keys, as in create_memory.
+
+    Returns:
+    list: The ids of the memories, in the same order as items.
+
+    Example:
+    >>> create_memories('sample_category', [{'text': 'sample_text', 'metadata': {'sample_key': 'sample_value'}}, {'text': 'other_text'}])
+    """
+
+    if len(items) == 0:
+        return []
+
     # get or create the collection
-    memories = get_client().get_or_create_collection(category)
-
-    # add timestamps to metadata
-    metadata["created_at"] = datetime.datetime.now().timestamp()
-    metadata["updated_at"] = datetime.datetime.now().timestamp()
-
-    # for each field in metadata...
-    # if the field is a boolean, convert it to a string
-    for key, value in metadata.items():
-        if isinstance(value, bool) or isinstance(value, dict) or isinstance(value, list):
-            debug_log(f"WARNING: Boolean metadata field {key} converted to string")
-            metadata[key] = str(value)
-
-    # insert the document into the collection
-    memories.upsert(
-        ids=[id],
-        documents=[text],
-        metadatas=[metadata],
-        embeddings=[embedding] if embedding is not None else None,
-    )
+    memories = _collection(category)
+
+    # add timestamps to metadata, shared by the whole batch
+    timestamp = time.time()
+
+    # generate missing ids, unless the collection assigns its own
+    if memories.assigns_ids:
+        ids = [None] * len(items)
+    else:
+        ids = [item["id"] if item.get("id") is not None else new_id() for item in items]
+
+    documents = []
+    metadatas = []
+    embeddings = []
+    for item in items:
+        # copy the metadata so that the caller's dict is left untouched
+        metadata = dict(item["metadata"]) if item.get("metadata") else {}
+        metadata["created_at"] = metadata["updated_at"] = timestamp
+
+        documents.append(item["text"])
+        metadatas.append(_stringify_metadata(metadata))
+        embeddings.append(item.get("embedding"))
+
+    # upsert groups of (indices of the items, their embeddings or None to let
+    # the collection compute them)
+    everything = list(range(len(items)))
+    missing = [i for i in everything if embeddings[i] is None]
+    if len(missing) == len(items):
+        groups = [(everything, None)]
+    elif len(missing) == 0:
+        groups = [(everything, embeddings)]
+    else:
+        # some embeddings are provided, compute the others ourselves
+        computed = memories.embed([documents[i] for i in missing])
+        if computed is not None:
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+            groups = [(everything, embeddings)]
+        else:
+            provided = [i for i in everything if embeddings[i] is not None]
+            groups = [(provided, [embeddings[i] for i in provided]), (missing, None)]
+
+    # insert the documents into the collection
+    for indices, group_embeddings in groups:
+        assigned = memories.upsert(
+            ids=[ids[i] for i in indices],
+            documents=[documents[i] for i in indices],
+            metadatas=[metadatas[i] for i in indices],
+            embeddings=group_embeddings,
+        )
+        if memories.assigns_ids:
+            for i, id in zip(indices, assigned):
+                ids[i] = id
+
+    # an explicit id may overwrite a cached novel memory
+    if any(item.get("id") is not None for item in items):
+        _novel_memories.clear()
 
-    debug_log(f"Created memory {id}: {text}", metadata)
-    return id
+    if DEBUG:
+        debug_log(f"Created memories {ids} in category {category}", {"documents": documents, "metadatas": metadatas})
+    return ids
 
 
-def create_unique_memory(category, content, metadata={}, similarity=0.95):
+def create_unique_memory(category, content, metadata=None, similarity=0.95):
     """
     Creates a new memory if there aren't any that are very similar to it
 
@@ -67,30 +244,45 @@ def create_unique_memory(category, content, metadata={}, similarity=0.95):
     - similarity (float, optional): The threshold for determining similarity.
         Defaults to DEFAULT_SIMILARY_THRESHOLD.
 
-    Returns: None
+    Returns: str - The id of the new memory.
     """
 
+    metadata = dict(metadata) if metadata else {}
+
     max_distance = 1.0 - similarity
 
-    memories = search_memory(
-        category,
-        min_distance=0,
-        max_distance=max_distance,
-        search_text=content,
-        n_results=1,
-        filter_metadata={"novel": "True"},
-    )
+    # contents seen recently are linked to the same novel memory without searching,
+    # as long as it is within max_distance
+    key = _text_key(category, content)
+    related = _novel_memories.get(key)
+
+    if related is None or related["distance"] > max_distance:
+        memories = search_memory(
+            category,
+            min_distance=0,
+            max_distance=max_distance,
+            search_text=content,
+            n_results=1,
+            novel=True,
+        )
 
-    if len(memories) == 0:
-        metadata["novel"] = "True"
-        create_memory(category, content, metadata=metadata)
-        return
+        if len(memories) == 0:
+            metadata["novel"] = "True"
+            id = create_memory(category, content, metadata=metadata)
+            _novel_memories.put(key, {"id": id, "document": content, "distance": 0.0})
+            return id
+
+        related = {
+            "id": memories[0]["id"],
+            "document": memories[0]["document"],
+            "distance": memories[0]["distance"],
+        }
+        _novel_memories.put(key, related)
 
     metadata["novel"] = "False"
-    metadata["related_to"] = memories[0]["id"]
-    metadata["related_document"] = memories[0]["document"]
-    create_memory(category, content, metadata=metadata)
-    return id
+    metadata["related_to"] = related["id"]
+    metadata["related_document"] = related["document"]
+    return create_memory(category, content, metadata=metadata)
 
 
 def search_memory(
@@ -99,7 +291,7 @@ def search_memory(
     n_results=5,
     filter_metadata=None,
     contains_text=None,
-    include_embeddings=True,
+    include_embeddings=False,
     include_distances=True,
     max_distance=None,  # 0.0 - 1.0
     min_distance=None,  # 0.0 - 1.0
@@ -114,7 +306,7 @@ def search_memory(
     n_results (int): Number of results to be returned.
     filter_metadata (dict): Metadata for filtering the results.
     contains_text (str): Text that must be contained in the documents.
-    include_embeddings (bool): Whether to include embeddings in the results.
+    include_embeddings (bool): Whether to include embeddings in the results. Defaults to False.
     include_distances (bool): Whether to include distances in the results.
     max_distance (float): Only include memories with this distance threshold maximum.
         0.1 = most memories will be exluded, 1.0 = no memories will be excluded
@@ -135,65 +327,91 @@ def search_memory(
         contains_text = {"$contains": contains_text}
 
     # get or create the collection
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
-    if (memories.count()) == 0:
+    count = memories.count()
+    if count == 0:
         return []
 
     # min n_results to prevent searching for more elements than are available
-    n_results = min(n_results, memories.count())
+    n_results = min(n_results, count)
 
     # get the types to include
-    include_types = get_include_types(include_embeddings, include_distances)
+    # distances are needed to apply max_distance and min_distance
+    include_types = get_include_types(
+        include_embeddings,
+        include_distances or max_distance is not None or min_distance is not None,
+    )
 
     # filter_metadata is a dictionary of metadata to filter by
-    if filter_metadata is not None and len(filter_metadata.keys()) > 1:
-        # map each key:value in filter_metadata to an object shaped like { "key": { "$eq": "value" } }
-        filter_metadata = [
-            {key: {"$eq": value}} for key, value in filter_metadata.items()
-        ]
-
-        filter_metadata = {"$and": filter_metadata}
+    where = _build_where(filter_metadata, novel)
 
-    if novel:
-        if filter_metadata is None:
-            filter_metadata = {}
-        filter_metadata["novel"] = "True"
+    # reuse the embedding of previous searches for the same text
+    query_embedding = _query_embedding(memories, category, search_text)
+    if query_embedding is None:
+        search = {"query_texts": [search_text]}
+    else:
+        search = {"query_embeddings": [query_embedding]}
 
     # perform the query and get the response
-    query = memories.query(
-        query_texts=[search_text],
-        where=filter_metadata,
+    query = _query_within_distance(
+        memories,
+        n_results,
+        max_distance,
+        **search,
+        where=where,
         where_document=contains_text,
-        n_results=n_results,
         include=include_types,
     )
 
-    # if isinstance(query, list):
-    query = flatten_arrays(query)
+    # drop the results out of range before building the list
+    if min_distance is not None and min_distance <= 0:
+        min_distance = None
+    if max_distance is not None and max_distance >= 1.0:
+        max_distance = None
+    if min_distance is not None or max_distance is not None:
+        query = filter_distances(query, min_distance, max_distance)
 
     # convert the query response to list and return
     result_list = chroma_collection_to_list(query)
 
-    if min_distance is not None and min_distance > 0:
-        result_list = [res for res in result_list if res["distance"] >= min_distance]
+    if DEBUG:
+        debug_log(f"Searched memory: {search_text}", result_list)
 
-    if max_distance is not None and max_distance < 1.0:
-        result_list = [res for res in result_list if res["distance"] <= max_distance]
+    return result_list
 
-    debug_log(f"Searched memory: {search_text}", result_list)
 
-    return result_list
+def _query_within_distance(memories, n_results, max_distance, **query_kwargs):
+    """
+    Query a collection and flatten the response. When max_distance is set, a
+    first query only fetches DISTANCE_PROBE_SIZE results, and the full
+    n_results are only fetched if all of them are within max_distance.
+    """
+
+    if max_distance is None or max_distance >= 1.0 or n_results <= DISTANCE_PROBE_SIZE:
+        return flatten_arrays(memories.query(n_results=n_results, **query_kwargs))
+
+    query = flatten_arrays(
+        memories.query(n_results=DISTANCE_PROBE_SIZE, **query_kwargs)
+    )
 
+    # results are sorted by distance, so if the farthest one is out of range,
+    # the results we did not fetch would be filtered out too
+    distances = query["distances"]
+    if len(distances) < DISTANCE_PROBE_SIZE or distances[-1] > max_distance:
+        return query
 
-def get_memory(category, id, include_embeddings=True):
+    return flatten_arrays(memories.query(n_results=n_results, **query_kwargs))
+
+
+def get_memory(category, id, include_embeddings=False):
     """
     Retrieve a specific memory from a given category based on its ID.
 
     Arguments:
         category (str): The category of the memory.
         id (str/int): The ID of the memory.
-        include_embeddings (bool, optional): Whether to include the embeddings. Defaults to True.
+        include_embeddings (bool, optional): Whether to include the embeddings. Defaults to False.
 
     Returns:
         dict: The retrieved memory.
@@ -203,7 +421,7 @@ def get_memory(category, id, include_embeddings=True):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
     # Get the types to include based on the function parameters
     include_types = get_include_types(include_embeddings, False)
@@ -212,7 +430,8 @@ def get_memory(category, id, include_embeddings=True):
 
     memory = chroma_collection_to_list(memory)
 
-    debug_log(f"Got memory {id} from category {category}", memory)
+    if DEBUG:
+        debug_log(f"Got memory {id} from category {category}", memory)
 
     if len(memory) == 0:
         debug_log(
@@ -225,13 +444,31 @@ def get_memory(category, id, include_embeddings=True):
     return memory[0]
 
 
+def get_memory_with_embedding(category, id):
+    """
+    Retrieve a specific memory from a given category based on its ID, including its embedding.
+
+    Arguments:
+        category (str): The category of the memory.
+        id (str/int): The ID of the memory.
+
+    Returns:
+        dict: The retrieved memory, with an "embedding" key.
+
+    Example:
+        >>> get_memory_with_embedding("books", "1")
+    """
+
+    return get_memory(category, id, include_embeddings=True)
+
+
 def get_memories(
     category,
     sort_order="desc",
     contains_text=None,
     filter_metadata=None,
     n_results=20,
-    include_embeddings=True,
+    include_embeddings=False,
     novel=False,
 ):
     """
@@ -242,7 +479,7 @@ def get_memories(
         sort_order (str, optional): The sorting order of the memories. Can be 'asc' or 'desc'. Defaults to 'desc'.
         filter_metadata (dict, optional): Filter to apply on metadata. Defaults to None.
         n_results (int, optional): The number of results to return. Defaults to 20.
-        include_embeddings (bool, optional): Whether to include the embeddings. Defaults to True.
+        include_embeddings (bool, optional): Whether to include the embeddings. Defaults to False.
         novel (bool, optional): Whether to only include memories that are marked as novel. Defaults to False.
 
     Returns:
@@ -253,10 +490,14 @@ def get_memories(
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
+
+    count = memories.count()
+    if count == 0:
+        return []
 
     # min n_results to prevent searching for more elements than are available
-    n_results = min(n_results, memories.count())
+    n_results = min(n_results, count)
 
     # Get the types to include based on the function parameters
     include_types = get_include_types(include_embeddings, False)
@@ -267,35 +508,30 @@ def get_memories(
         where_document = {"$contains": contains_text}
 
     # filter_metadata is a dictionary of metadata to filter by
-    if filter_metadata is not None and len(filter_metadata.keys()) > 1:
-        # map each key:value in filter_metadata to an object shaped like { "key": { "$eq": "value" } }
-        filter_metadata = [
-            {key: {"$eq": value}} for key, value in filter_metadata.items()
-        ]
+    where = _build_where(filter_metadata, novel)
 
-        filter_metadata = {"$and": filter_metadata}
+    # Retrieve only the ids of the memories that meet the given filters
+    ids = memories.get(where=where, where_document=where_document, include=[])[
+        "ids"
+    ]
 
-    if novel:
-        if filter_metadata is None:
-            filter_metadata = {}
-        filter_metadata["novel"] = "True"
+    # Only keep the ids of the top n_results memories, sorted by ID
+    if sort_order == "desc":
+        ids = heapq.nlargest(n_results, ids)
+    else:
+        ids = heapq.nsmallest(n_results, ids)
 
-    # Retrieve all memories that meet the given metadata filter
-    memories = memories.get(
-        where=filter_metadata, where_document=where_document, include=include_types
-    )
+    if len(ids) == 0:
+        return []
 
-    if not isinstance(memories, list):
-        # Convert the collection to list format
-        memories = chroma_collection_to_list(memories)
+    # Retrieve the kept memories and convert the collection to list format
+    memories = chroma_collection_to_list(memories.get(ids=ids, include=include_types))
 
     # Sort memories by ID. If sort_order is 'desc', then the reverse parameter will be True, and memories will be sorted in descending order.
     memories.sort(key=lambda x: x["id"], reverse=sort_order == "desc")
 
-    # Only keep the top n_results memories
-    memories = memories[:n_results]
-
-    debug_log(f"Got memories from category {category}", memories)
+    if DEBUG:
+        debug_log(f"Got memories from category {category}", memories)
 
     return memories
 
@@ -321,21 +557,15 @@ def update_memory(category, id, text=None, metadata=None, embedding=None):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
     # If neither text nor metadata is provided, raise an exception
     if metadata is None and text is None:
         raise Exception("No text or metadata provided")
-    if metadata is not None:
-        # for each key value in metadata -- if the type is boolean, convert it to string
-        for key, value in metadata.items():
-            if isinstance(value, bool) or isinstance(value, dict) or isinstance(value, list):
-                debug_log(f"WARNING: Boolean metadata field {key} converted to string")
-                metadata[key] = str(value)
-    else:
-        metadata = {}
 
-    metadata["updated_at"] = datetime.datetime.now().timestamp()
+    # copy the metadata so that the caller's dict is left untouched
+    metadata = _stringify_metadata(dict(metadata) if metadata else {})
+    metadata["updated_at"] = time.time()
 
     documents = [text] if text is not None else None
     metadatas = [metadata] if metadata is not None else None
@@ -345,10 +575,14 @@ def update_memory(category, id, text=None, metadata=None, embedding=None):
         ids=[str(id)], documents=documents, metadatas=metadatas, embeddings=embeddings
     )
 
-    debug_log(
-        f"Updated memory {id} in category {category}",
-        {"documents": documents, "metadatas": metadatas},
-    )
+    # the update may change the text or the novel flag of a cached memory
+    _novel_memories.clear()
+
+    if DEBUG:
+        debug_log(
+            f"Updated memory {id} in category {category}",
+            {"documents": documents, "metadatas": metadatas},
+        )
 
 
 def delete_memory(category, id):
@@ -367,7 +601,7 @@ def delete_memory(category, id):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
     if memory_exists(category, id) is False:
         debug_log(
@@ -377,8 +611,10 @@ def delete_memory(category, id):
         return
     # Delete the memory
     memories.delete(ids=[str(id)])
+    _novel_memories.clear()
 
-    debug_log(f"Deleted memory {id} in category {category}")
+    if DEBUG:
+        debug_log(f"Deleted memory {id} in category {category}")
 
 
 def delete_memories(category, document=None, metadata=None):
@@ -398,15 +634,17 @@ def delete_memories(category, document=None, metadata=None):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
     # Create a query to match either the document or the metadata
     if document is not None:
         memories.delete(where_document={"$contains": document})
     if metadata is not None:
         memories.delete(where=metadata)
+    _novel_memories.clear()
 
-    debug_log(f"Deleted memories from category {category}")
+    if DEBUG:
+        debug_log(f"Deleted memories from category {category}")
 
     return True
 
@@ -422,30 +660,38 @@ def delete_similar_memories(category, content, similarity_threshold=0.95):
     Returns: bool - True if the memory item is found and removed, False otherwise.
     """
 
-    memories = search_memory(category, content)
+    # only the ids and distances of the results are needed
+    memories = search_memory(
+        category, content, include_embeddings=False, include_distances=True
+    )
     memories_to_delete = []
 
     # find similar memories
     if len(memories) > 0:
-        for memory in memories:
-            goal_similarity = 1.0 - memory["distance"]
-            if goal_similarity > similarity_threshold:
-                memories_to_delete.append(memory["id"])
-            else:
-                # responses are sorted by similarity, so ignore the rest
-                break
+        distances = np.fromiter(
+            (memory["distance"] for memory in memories),
+            dtype=float,
+            count=len(memories),
+        )
+        # compare every result to the threshold, without relying on the
+        # response being sorted by distance
+        mask = (1.0 - distances) > similarity_threshold
+        memories_to_delete = [memories[i]["id"] for i in np.flatnonzero(mask)]
 
     if len(memories_to_delete) > 0:
+        if DEBUG:
+            debug_log(
+                f"Deleting similar memories to {content} in category {category}",
+                memories_to_delete,
+            )
+        # delete them all at once, deleting missing ids is a no-op
+        _collection(category).delete(ids=[str(id) for id in memories_to_delete])
+        _novel_memories.clear()
+    else:
         debug_log(
-            f"Deleting similar memories to {content} in category {category}",
-            memories_to_delete,
+            f"WARNING: Tried to delete similar memories to {content} in category {category} but none were found",
+            type="warning",
         )
-        for memory in memories_to_delete:
-            delete_memory(category, memory)
-    debug_log(
-        f"WARNING: Tried to delete similar memories to {content} in category {category} but none were found",
-        type="warning",
-    )
     return len(memories_to_delete) > 0
 
 
@@ -466,16 +712,17 @@ def memory_exists(category, id, includes_metadata=None):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
-    # Check if there's a memory with the given ID and metadata
-    memory = memories.get(ids=[str(id)], where=includes_metadata, limit=1)
+    # Check if there's a memory with the given ID and metadata, only fetching its id
+    memory = memories.get(ids=[str(id)], where=includes_metadata, limit=1, include=[])
 
     exists = len(memory["ids"]) > 0
 
-    debug_log(
-        f"Checking if memory {id} exists in category {category}. Exists: {exists}"
-    )
+    if DEBUG:
+        debug_log(
+            f"Checking if memory {id} exists in category {category}. Exists: {exists}"
+        )
 
     # Return True if at least one memory was found, False otherwise
     return exists
@@ -487,6 +734,7 @@ def count_memories(category, novel=False):
 
     Arguments:
         category (str): The category of the memories.
+        novel (bool, optional): Whether to only count memories that are marked as novel. Defaults to False.
 
     Returns:
         int: The number of memories.
@@ -496,15 +744,19 @@ def count_memories(category, novel=False):
     """
 
     # Get or create the collection for the given category
-    memories = get_client().get_or_create_collection(category)
+    memories = _collection(category)
 
     if novel:
-        memories = memories.get(where={"novel": "True"})
+        # only fetch the ids of the novel memories
+        count = len(memories.get(where=_build_where(None, novel), include=[])["ids"])
+    else:
+        count = memories.count()
 
-    debug_log(f"Counted memories in {category}: {memories.count()}")
+    if DEBUG:
+        debug_log(f"Counted memories in {category}: {count}")
 
     # Return the count of memories
-    return memories.count()
+    return count
 
 
 def wipe_category(category):
@@ -533,6 +785,9 @@ def wipe_category(category):
     if collection is not None:
         # Delete the entire category
         get_client().delete_collection(category)
+        _cached_collection.cache_clear()
+        _query_embeddings.clear()
+        _novel_memories.clear()
 
 
 def wipe_all_memories():
@@ -545,8 +800,47 @@ def wipe_all_memories():
     client = get_client()
     collections = client.list_collections()
 
-    # Iterate over all collections
-    for collection in collections:
-        client.delete_collection(collection.name)
+    # Delete all collections concurrently, they are independent
+    if len(collections) > 0:
+        with ThreadPoolExecutor(max_workers=min(32, len(collections))) as executor:
+            # consume the results so that errors are raised here
+            list(
+                executor.map(
+                    lambda collection: client.delete_collection(collection.name),
+                    collections,
+                )
+            )
+    _cached_collection.cache_clear()
+    _query_embeddings.clear()
+    _novel_memories.clear()
 
     debug_log("Wiped all memories", type="system")
+
+
+def _run_in_thread(function):
+    """
+    Wrap a blocking memory function into a coroutine that runs it in a worker
+    thread, so that several calls can be awaited together with asyncio.gather.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(function, *args, **kwargs)
+
+    wrapper.__name__ = wrapper.__qualname__ = "a" + function.__name__
+    return wrapper
+
+
+acreate_memory = _run_in_thread(create_memory)
+acreate_memories = _run_in_thread(create_memories)
+acreate_unique_memory = _run_in_thread(create_unique_memory)
+asearch_memory = _run_in_thread(search_memory)
+aget_memory = _run_in_thread(get_memory)
+aget_memory_with_embedding = _run_in_thread(get_memory_with_embedding)
+aget_memories = _run_in_thread(get_memories)
+aupdate_memory = _run_in_thread(update_memory)
+adelete_memory = _run_in_thread(delete_memory)
+adelete_memories = _run_in_thread(delete_memories)
+adelete_similar_memories = _run_in_thread(delete_similar_memories)
+amemory_exists = _run_in_thread(memory_exists)
+acount_memories = _run_in_thread(count_memories)
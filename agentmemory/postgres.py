@@ -97,6 +97,8 @@ def parse_conditions(where=None, where_document=None, ids=None):
     return conditions, params
 
 class PostgresCollection(CollectionMemory):
+    assigns_ids = True
+
     def __init__(self, category, client: PostgresClient, metadata=None):
         self.category = category
         self.client = client
@@ -115,18 +117,18 @@ class PostgresCollection(CollectionMemory):
         table_name = self.client._table_name(self.category)
 
         query = f"SELECT COUNT(*) FROM {table_name}"
-        self.client.cur.execute(query)
-
-        return self.client.cur.fetchone()[0]
+        with self.client.connection.cursor() as cur:
+            cur.execute(query)
+            return cur.fetchone()[0]
 
     def add(self, ids=None, documents=None, metadatas=None, embeddings=None):
         # dropping ids, using database serial
         embeddings = embeddings or repeat(None)
         metadatas = metadatas or repeat({})
-        for document, metadata, emb in zip(
-            documents, metadatas, embeddings
-        ):
-            self.client.insert_memory(self.category, document, metadata, emb)
+        return [
+            str(self.client.insert_memory(self.category, document, metadata, emb))
+            for document, metadata, emb in zip(documents, metadatas, embeddings)
+        ]
 
     def get(
         self,
@@ -154,12 +156,12 @@ class PostgresCollection(CollectionMemory):
         query += " LIMIT %s OFFSET %s"
         params.extend([limit, offset])
 
-        self.client.cur.execute(query, tuple(params))
-
-        rows = self.client.cur.fetchall()
+        with self.client.connection.cursor() as cur:
+            cur.execute(query, tuple(params))
+            rows = cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
 
         # Convert rows to list of dictionaries
-        columns = [desc[0] for desc in self.client.cur.description]
         metadata_columns = [
             col for col in columns if col not in ["id", "document", "embedding"]
         ]
@@ -206,7 +208,7 @@ class PostgresCollection(CollectionMemory):
         include=["metadatas", "documents", "distances"],
     ):
         return self.client.query(
-            self.category, query_texts, n_results, where, where_document
+            self.category, query_texts, n_results, where, where_document, query_embeddings
         )
 
     def update(self, ids, documents=None, metadatas=None, embeddings=None):
@@ -223,7 +225,10 @@ class PostgresCollection(CollectionMemory):
                 self.client.update(self.category, id_, document, metadata, emb)
 
     def upsert(self, ids, documents=None, metadatas=None, embeddings=None):
-        self.add(ids, documents, metadatas, embeddings)
+        return self.add(ids, documents, metadatas, embeddings)
+
+    def embed(self, texts):
+        return [self.client.create_embedding(text) for text in texts]
 
     def delete(self, ids=None, where=None, where_document=None):
         table_name = self.client._table_name(self.category)
@@ -234,7 +239,8 @@ class PostgresCollection(CollectionMemory):
         else:
             raise Exception("No valid conditions provided for deletion.")
 
-        self.client.cur.execute(query, tuple(params))
+        with self.client.connection.cursor() as cur:
+            cur.execute(query, tuple(params))
         self.client.connection.commit()
 
 
@@ -249,11 +255,11 @@ class PostgresClient(AgentMemory):
         model_path=default_model_path,
         embedding_width=384,
     ):
+        # psycopg2 cursors are not thread-safe: every call opens its own
         self.connection = psycopg2.connect(connection_string)
-        self.cur = self.connection.cursor()
         from pgvector.psycopg2 import register_vector
 
-        register_vector(self.cur)  # Register PGVector functions
+        register_vector(self.connection)  # Register PGVector functions
         full_model_path = check_model(model_name=model_name, model_path=model_path)
         self.model_path = full_model_path
         self.embedding_width = embedding_width
@@ -264,44 +270,48 @@ class PostgresClient(AgentMemory):
 
     def ensure_table_exists(self, category):
         table_name = self._table_name(category)
-        self.cur.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id SERIAL PRIMARY KEY,
-                document TEXT NOT NULL,
-                embedding VECTOR({self.embedding_width})
+        with self.connection.cursor() as cur:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table_name} (
+                    id SERIAL PRIMARY KEY,
+                    document TEXT NOT NULL,
+                    embedding VECTOR({self.embedding_width})
+                )
+            """
             )
-        """
-        )
         self.connection.commit()
 
     def _ensure_metadata_columns_exist(self, category, metadata):
         table_name = self._table_name(category)
-        for key in metadata.keys():
-            self.cur.execute(
-                """
-                SELECT EXISTS (
-                    SELECT 1
-                    FROM pg_catalog.pg_attribute
-                    WHERE attrelid = %s::regclass
-                    AND attname = %s
-                    AND NOT attisdropped
+        with self.connection.cursor() as cur:
+            for key in metadata.keys():
+                cur.execute(
+                    """
+                    SELECT EXISTS (
+                        SELECT 1
+                        FROM pg_catalog.pg_attribute
+                        WHERE attrelid = %s::regclass
+                        AND attname = %s
+                        AND NOT attisdropped
+                    )
+                """,
+                    (table_name, key),
                 )
-            """,
-                (table_name, key),
-            )
-            exists = self.cur.fetchone()[0]
-            if not exists:
-                self.cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {key} TEXT")
-                self.connection.commit()
+                exists = cur.fetchone()[0]
+                if not exists:
+                    cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {key} TEXT")
+                    self.connection.commit()
 
     def list_collections(self):
-        self.cur.execute(
-            "SELECT table_name FROM information_schema.tables WHERE table_schema='public'"
-        )
+        with self.connection.cursor() as cur:
+            cur.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema='public'"
+            )
+            rows = cur.fetchall()
         return [
             AgentCollection(name=row[0].split("_")[1])
-            for row in self.cur.fetchall()
+            for row in rows
             if row[0].startswith("memory_")
         ]
 
@@ -316,7 +326,9 @@ class PostgresClient(AgentMemory):
 
     def delete_collection(self, category):
         table_name = self._table_name(category)
-        self.cur.execute(f"DROP TABLE IF EXISTS {table_name}")
+        # use a dedicated cursor, collections may be deleted from several threads
+        with self.connection.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {table_name}")
         self.connection.commit()
         self.collections.pop(category, None)
 
@@ -344,9 +356,11 @@ class PostgresClient(AgentMemory):
         INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})
         RETURNING id;
         """
-        self.cur.execute(query, tuple(values))
+        with self.connection.cursor() as cur:
+            cur.execute(query, tuple(values))
+            id_ = cur.fetchone()[0]
         self.connection.commit()
-        return self.cur.fetchone()[0]
+        return id_
 
     def create_embedding(self, document):
         embeddings = infer_embeddings([document], model_path=self.model_path)
@@ -371,7 +385,7 @@ class PostgresClient(AgentMemory):
             self.connection.commit()
 
     def query(
-        self, category, query_texts, n_results=5, where=None, where_document=None
+        self, category, query_texts, n_results=5, where=None, where_document=None, query_embeddings=None
     ):
         collection = self.get_or_create_collection(category, parse_metadata(where))
         table_name = self._table_name(category)
@@ -387,9 +401,10 @@ class PostgresClient(AgentMemory):
             "embeddings": [],
             "distances": [],
         }
+        if query_embeddings is None:
+            query_embeddings = [self.create_embedding(text) for text in query_texts]
         with self.connection.cursor() as cur:
-            for emb in query_texts:
-                query_emb = self.create_embedding(emb)
+            for query_emb in query_embeddings:
                 params_with_emb = [query_emb] + params + [query_emb, n_results]
                 string = f"""
                     SELECT id, document, embedding, embedding <-> %s AS distance, *
@@ -455,7 +470,6 @@ class PostgresClient(AgentMemory):
             self.connection.commit()
 
     def close(self):
-        self.cur.close()
         self.connection.close()
 
 
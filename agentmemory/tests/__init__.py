@@ -1,5 +1,6 @@
 from .helpers import *
 from .main import *
+from .batcher import *
 from .persistence import *
 from .events import *
 from .clustering import *
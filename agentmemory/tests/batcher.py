@@ -0,0 +1,89 @@
+import asyncio
+
+from agentmemory import count_memories, get_memory, wipe_category
+from agentmemory.batcher import MemoryBatcher, create_memory_async
+
+
+def test_batcher_flush():
+    wipe_category("test")
+    batcher = MemoryBatcher(batch_timeout_ms=60000)
+    futures = [
+        batcher.submit("test", "document " + str(i), metadata={"test": "test"})
+        for i in range(5)
+    ]
+
+    # nothing is written before the batch window closes
+    assert not any(future.done() for future in futures)
+
+    batcher.flush()
+
+    ids = [future.result(timeout=5) for future in futures]
+    assert count_memories("test") == 5
+    assert get_memory("test", ids[2])["document"] == "document 2"
+    wipe_category("test")
+
+
+def test_batcher_timeout():
+    wipe_category("test")
+    batcher = MemoryBatcher(batch_timeout_ms=10)
+    future = batcher.submit("test", "timed document")
+
+    id = future.result(timeout=5)
+    assert get_memory("test", id)["document"] == "timed document"
+    wipe_category("test")
+
+
+def test_batcher_max_batch_size():
+    wipe_category("test")
+    batcher = MemoryBatcher(max_batch_size=3, batch_timeout_ms=60000)
+    futures = [batcher.submit("test", "document " + str(i)) for i in range(3)]
+
+    # a full batch is written without waiting for the timeout
+    for future in futures:
+        future.result(timeout=5)
+    assert count_memories("test") == 3
+    wipe_category("test")
+
+
+def test_batcher_cancelled_future():
+    wipe_category("test")
+    batcher = MemoryBatcher(batch_timeout_ms=50)
+    cancelled = batcher.submit("test", "cancelled document")
+    assert cancelled.cancel()
+
+    # the worker is still alive and writes the next memories
+    id = batcher.submit("test", "timed document").result(timeout=5)
+    assert get_memory("test", id)["document"] == "timed document"
+    assert count_memories("test") == 1
+    wipe_category("test")
+
+
+def test_batcher_invalid_memory():
+    wipe_category("test")
+    batcher = MemoryBatcher(batch_timeout_ms=60000)
+    bad = batcher.submit("test", "bad document", metadata={"test": None})
+    good = batcher.submit("test", "good document")
+    batcher.flush()
+
+    # the invalid memory doesn't fail the other memories of its batch
+    assert bad.exception(timeout=5) is not None
+    id = good.result(timeout=5)
+    assert get_memory("test", id)["document"] == "good document"
+    assert count_memories("test") == 1
+    wipe_category("test")
+
+
+def test_create_memory_async():
+    wipe_category("test")
+
+    async def create_all():
+        return await asyncio.gather(
+            *[create_memory_async("test", "document " + str(i)) for i in range(5)]
+        )
+
+    ids = asyncio.run(create_all())
+
+    assert len(set(ids)) == 5
+    assert count_memories("test") == 5
+    assert get_memory("test", ids[2])["document"] == "document 2"
+    wipe_category("test")
@@ -36,7 +36,7 @@ def test_cluster_no_neighbors():
     # Run clustering
     cluster(epsilon=0.5, min_samples=6, category="numbers")
 
-    memories_data = get_memories("numbers")
+    memories_data = get_memories("numbers", include_embeddings=True)
 
     assert memories_data[0]['embedding'] is not None
 
@@ -9,7 +9,13 @@ from agentmemory import (
     list_to_chroma_collection,
     wipe_all_memories,
 )
-from agentmemory.helpers import flatten_arrays, get_include_types
+from agentmemory.helpers import (
+    LRUCache,
+    filter_distances,
+    flatten_arrays,
+    get_include_types,
+    new_id,
+)
 from agentmemory.persistence import (
     export_memory_to_file,
     export_memory_to_json,
@@ -47,6 +53,20 @@ def test_chroma_collection_conversion():
     assert new_collection_data["ids"] == test_collection_data["ids"], "Ids should match"
 
 
+def test_chroma_collection_to_list_distances_without_embeddings():
+    collection = {
+        "metadatas": [{"test": "test"}],
+        "documents": ["document 1"],
+        "ids": ["id1"],
+        "embeddings": None,
+        "distances": [0.5],
+    }
+    list_data = chroma_collection_to_list(collection)
+    assert list_data == [
+        {"metadata": {"test": "test"}, "document": "document 1", "id": "id1", "distance": 0.5}
+    ], "Distances should be kept without embeddings"
+
+
 def test_get_chroma_client():
     wipe_all_memories()
     client = get_client()
@@ -71,6 +91,37 @@ def test_flatten_arrays():
     assert flattened["ids"] == ["id1", "id2"], "Flatten ids failed"
 
 
+def test_filter_distances():
+    test_dict = {
+        "metadatas": ["metadata1", "metadata2", "metadata3"],
+        "documents": ["document1", "document2", "document3"],
+        "ids": ["id1", "id2", "id3"],
+        "embeddings": None,
+        "distances": [0.1, 0.5, 0.9],
+    }
+    filtered = filter_distances(test_dict, min_distance=0.2, max_distance=0.8)
+    assert filtered["ids"] == ["id2"], "Filter ids failed"
+    assert filtered["documents"] == ["document2"], "Filter documents failed"
+    assert filtered["distances"] == [0.5], "Filter distances failed"
+    assert filtered["embeddings"] is None, "Missing embeddings should stay None"
+
+    filtered = filter_distances(test_dict, max_distance=0.2)
+    assert filtered["ids"] == [], "Filter all failed"
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1, "Get failed"
+
+    # "b" is now the least recently used entry
+    cache.put("c", 3)
+    assert cache.get("b") is None, "Least recently used entry should be evicted"
+    assert cache.get("a") == 1, "Recently used entry should be kept"
+    assert len(cache) == 2, "Cache should be bounded by maxsize"
+
+
 def test_get_include_types():
     include_types = get_include_types(True, False)
     assert include_types == [
@@ -166,3 +217,9 @@ def test_import_file_to_memory():
     # Test with invalid path
     with pytest.raises(Exception):
         import_file_to_memory(path="")
+
+
+def test_new_id():
+    ids = [new_id() for _ in range(1000)]
+    assert all(len(id) == 16 for id in ids)
+    assert ids == sorted(set(ids))
@@ -1,8 +1,19 @@
+import asyncio
+import os
+import tempfile
 import time
+
+import numpy as np
+
+import agentmemory.client
 from agentmemory import (
+    acount_memories,
+    asearch_memory,
     search_memory,
     get_memory,
+    get_memory_with_embedding,
     create_memory,
+    create_memories,
     get_memories,
     update_memory,
     delete_memory,
@@ -11,7 +22,12 @@ from agentmemory import (
     wipe_all_memories,
     delete_memories,
 )
-from agentmemory.main import create_unique_memory, delete_similar_memories
+from agentmemory.main import (
+    _query_embeddings,
+    create_unique_memory,
+    delete_similar_memories,
+    memory_exists,
+)
 
 
 def test_memory_creation_and_retrieval():
@@ -34,6 +50,94 @@ def test_memory_creation_and_retrieval():
     wipe_category("test")
 
 
+def test_create_memories_some_embeddings():
+    wipe_category("test")
+    embedding = get_memory_with_embedding(
+        "test", create_memory("test", "document 0")
+    )["embedding"]
+
+    ids = create_memories(
+        "test",
+        [{"text": "document 1", "embedding": embedding}, {"text": "document 2"}],
+    )
+
+    assert get_memory_with_embedding("test", ids[0])["embedding"] == embedding
+    assert get_memory_with_embedding("test", ids[1])["embedding"] is not None
+    assert search_memory("test", "document 2")[0]["id"] == ids[1]
+    wipe_category("test")
+
+
+def test_get_memories_sort_order():
+    wipe_category("test")
+    for i in range(10):
+        create_memory("test", "document " + str(i), metadata={"even": str(i % 2 == 0)})
+
+    memories = get_memories("test", sort_order="asc", n_results=3)
+    assert [memory["document"] for memory in memories] == [
+        "document 0",
+        "document 1",
+        "document 2",
+    ]
+
+    memories = get_memories("test", filter_metadata={"even": "True"}, n_results=2)
+    assert [memory["document"] for memory in memories] == ["document 8", "document 6"]
+    wipe_category("test")
+
+
+def test_create_memories():
+    wipe_category("test")
+    ids = create_memories(
+        "test",
+        [
+            {"text": "document " + str(i), "metadata": {"test": "test"}}
+            for i in range(10)
+        ]
+        + [{"text": "document with id", "id": "custom_id"}],
+    )
+
+    assert len(ids) == 11
+    assert ids[-1] == "custom_id"
+    assert count_memories("test") == 11
+    assert get_memory("test", ids[3])["document"] == "document 3"
+    assert get_memory("test", "custom_id")["document"] == "document with id"
+    wipe_category("test")
+
+
+def test_create_memory_leaves_metadata_untouched():
+    wipe_category("test")
+    metadata = {"test": "test"}
+    create_memory("test", "document 1", metadata=metadata)
+    create_unique_memory("test", "document 2", metadata=metadata)
+    update_memory("test", get_memories("test")[0]["id"], metadata=metadata)
+
+    assert metadata == {"test": "test"}
+    wipe_category("test")
+
+
+def test_create_memory_stringifies_metadata():
+    wipe_category("test")
+    id = create_memory(
+        "test", "document 1", metadata={"flag": True, "tags": ["a"], "count": 1}
+    )
+
+    metadata = get_memory("test", id)["metadata"]
+    assert metadata["flag"] == "True"
+    assert metadata["tags"] == "['a']"
+    assert metadata["count"] == 1
+    wipe_category("test")
+
+
+def test_get_memory_with_embedding():
+    wipe_category("test")
+    create_memory("test", "document 1", id="1")
+
+    assert "embedding" not in get_memory("test", "1")
+    memory = get_memory_with_embedding("test", "1")
+    assert memory["document"] == "document 1"
+    assert memory["embedding"] is not None
+    wipe_category("test")
+
+
 def test_memory_deletion():
     wipe_category("test")
     # Delete memory test
@@ -89,6 +193,78 @@ def test_search_memory():
     wipe_category("test")
 
 
+def test_search_memory_reuses_query_embedding():
+    wipe_category("test")
+    create_memory("test", "document 1")
+
+    first = search_memory("test", "document 1")
+    assert len(_query_embeddings) == 1
+    (embedding,) = _query_embeddings._data.values()
+    assert embedding.dtype == np.float32
+
+    second = search_memory("test", "document 1")
+    assert len(_query_embeddings) == 1
+    assert first[0]["id"] == second[0]["id"]
+    wipe_category("test")
+
+
+def test_search_memory_novel_with_filter():
+    wipe_category("test")
+    create_memory("test", "document 1", metadata={"test": "test", "novel": "True"})
+    create_memory("test", "document 2", metadata={"test": "test", "novel": "False"})
+    create_memory("test", "document 3", metadata={"test": "other", "novel": "True"})
+
+    for filter_metadata in [{"test": "test"}, {"test": "test", "novel": "True"}]:
+        search_results = search_memory(
+            "test", "document", filter_metadata=filter_metadata, novel=True
+        )
+        assert [result["document"] for result in search_results] == ["document 1"]
+
+    memories = get_memories("test", filter_metadata={"test": "test"}, novel=True)
+    assert [memory["document"] for memory in memories] == ["document 1"]
+    wipe_category("test")
+
+
+def test_async_search_memory():
+    wipe_category("test")
+    for i in range(5):
+        create_memory("test", "document " + str(i + 1), metadata={"test": "test"})
+
+    async def search_all():
+        return await asyncio.gather(
+            *[asearch_memory("test", "document " + str(i + 1)) for i in range(5)]
+        )
+
+    results = asyncio.run(search_all())
+
+    for i, search_results in enumerate(results):
+        assert search_results[0]["document"] == "document " + str(i + 1)
+    wipe_category("test")
+
+
+def test_async_calls_create_client_once():
+    previous_client = agentmemory.client.client
+    previous_path = os.environ.get("STORAGE_PATH")
+    try:
+        with tempfile.TemporaryDirectory() as path:
+            # the first concurrent calls all need to create the client on a new store
+            os.environ["STORAGE_PATH"] = path
+            agentmemory.client.client = None
+
+            async def count_all():
+                return await asyncio.gather(
+                    *[acount_memories("test" + str(i)) for i in range(8)]
+                )
+
+            assert asyncio.run(count_all()) == [0] * 8
+    finally:
+        agentmemory.client.client = previous_client
+        if previous_path is None:
+            os.environ.pop("STORAGE_PATH", None)
+        else:
+            os.environ["STORAGE_PATH"] = previous_path
+
+
 def test_wipe_category():
     # test wipe_category
     wipe_category("test")
@@ -107,6 +283,26 @@ def test_count_memories():
     wipe_category("test")
 
 
+def test_memory_exists():
+    wipe_category("test")
+    create_memory("test", "document 1", metadata={"test": "test"}, id="1")
+    assert memory_exists("test", "1")
+    assert memory_exists("test", "1", includes_metadata={"test": "test"})
+    assert not memory_exists("test", "1", includes_metadata={"test": "other"})
+    assert not memory_exists("test", "2")
+    wipe_category("test")
+
+
+def test_count_novel_memories():
+    wipe_category("test")
+    create_memory("test", "document 1", metadata={"novel": "True"})
+    create_memory("test", "document 2", metadata={"novel": "False"})
+    create_memory("test", "document 3", metadata={"novel": "True"})
+    assert count_memories("test", novel=True) == 2
+    assert count_memories("test") == 3
+    wipe_category("test")
+
+
 def test_delete_memories():
     wipe_category("books")
     # create a memory to be deleted
@@ -132,6 +328,15 @@ def test_wipe_all_memories():
     assert count_memories("test") == 0
 
 
+def test_wipe_all_memories_many_categories():
+    for i in range(3):
+        create_memory("test" + str(i), "test document")
+    wipe_all_memories()
+    for i in range(3):
+        assert count_memories("test" + str(i)) == 0
+    wipe_all_memories()
+
+
 def test_memory_search_distance():
     wipe_category("test")
     create_memory("test", "cinammon duck cakes")
@@ -143,6 +348,27 @@ def test_memory_search_distance():
     wipe_category("test")
 
 
+def test_memory_search_distance_many_results():
+    wipe_category("test")
+    create_memory("test", "cinammon duck cakes")
+    for i in range(30):
+        create_memory("test", "unrelated document " + str(i))
+
+    max_dist_limited_memories = search_memory(
+        "test", "cinammon duck cakes", n_results=30, max_distance=0.1
+    )
+    assert len(max_dist_limited_memories) == 1
+
+    for i in range(19):
+        create_memory("test", "cinammon duck cakes")
+
+    max_dist_limited_memories = search_memory(
+        "test", "cinammon duck cakes", n_results=30, max_distance=0.1
+    )
+    assert len(max_dist_limited_memories) == 20
+    wipe_category("test")
+
+
 def test_delete_similar_memories():
     wipe_category("test")
     # Create a memory and a similar memory
@@ -185,4 +411,41 @@ def test_create_unique_memory():
     memories = get_memories("test")
     assert len(memories) == 3
     assert memories[0]["metadata"]["novel"] == "True"
-    wipe_category("test")
\ No newline at end of file
+    wipe_category("test")
+
+
+def test_create_unique_memory_repeated_content():
+    wipe_category("test")
+    novel_id = create_unique_memory("test", "unique_memory_1")
+
+    # the same content is linked to the novel memory from the cache
+    for _ in range(3):
+        id = create_unique_memory("test", "unique_memory_1")
+        memory = get_memory("test", id)
+        assert memory["metadata"]["novel"] == "False"
+        assert memory["metadata"]["related_to"] == novel_id
+        assert memory["metadata"]["related_document"] == "unique_memory_1"
+
+    # once the novel memory is deleted, the content is novel again
+    delete_memory("test", novel_id)
+    novel_id = create_unique_memory("test", "unique_memory_1")
+    assert get_memory("test", novel_id)["metadata"]["novel"] == "True"
+
+    # same once the novel memory is overwritten with other content
+    create_memory("test", "totally different content", id=novel_id)
+    id = create_unique_memory("test", "unique_memory_1")
+    memory = get_memory("test", id)
+    assert memory["metadata"]["novel"] == "True"
+    assert "related_to" not in memory["metadata"]
+    wipe_category("test")
+
+def test_create_unique_memory_after_metadata_update():
+    wipe_category("test")
+    novel_id = create_unique_memory("test", "unique_memory_1")
+
+    # once the memory is no longer novel, the content is novel again
+    update_memory("test", novel_id, metadata={"novel": "False"})
+    id = create_unique_memory("test", "unique_memory_1")
+    assert id != novel_id
+    assert get_memory("test", id)["metadata"]["novel"] == "True"
+    wipe_category("test")